@@ -11,6 +11,7 @@ rm -f "$LOG_DIR"/*.log
 rm -f "$LOG_DIR"/*.gz
 
 # Remove processed hashes and persistent DB
+rm -f "$OUTPUT_DIR"/processed_hashes.bin
 rm -f "$OUTPUT_DIR"/processed_hashes.txt
 rm -f "$OUTPUT_DIR"/persistent_attacks.json
 rm -f "$OUTPUT_DIR"/persistent_attacks_backup.json
@@ -4,13 +4,27 @@ Dionaea Log Processor - Improved Version with Incremental Updates
 Processes dionaea logs and creates web-ready data files
 """
 
+import argparse
 import json
 import datetime
+import hashlib
+import heapq
+import io
+import mmap
 import os
 import re
 import sys
+import shlex
 import shutil
-from collections import defaultdict, Counter
+import socket
+import subprocess
+import tarfile
+from array import array
+from bisect import bisect_right
+from collections import deque, Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from operator import itemgetter
 from pathlib import Path
 
 # Try to import optional dependencies
@@ -20,7 +34,92 @@ try:
 except ImportError:
     HAS_GEOIP = False
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
+
+# Data files consumed by the web dashboard
+_DASHBOARD_FILES = ('attacks.json', 'summary.json', 'hourly_stats.json', 'daily_stats.json')
+
+# Well-known service ports
+_PORT_MAP = {
+    21: 'ftp', 22: 'ssh', 23: 'telnet', 25: 'smtp',
+    53: 'dns', 80: 'http', 110: 'pop3', 135: 'epmap',
+    139: 'netbios', 143: 'imap', 443: 'https', 445: 'smb',
+    993: 'imaps', 995: 'pop3s', 1433: 'mssql', 3306: 'mysql',
+    3389: 'rdp', 5060: 'sip', 1723: 'pptp', 5000: 'upnp',
+    11211: 'memcache', 27017: 'mongo', 1883: 'mqtt',
+    631: 'printer', 69: 'tftp'
+}
+
+# Binary size distribution buckets: upper edges (exclusive) and their keys
+_BUCKET_EDGES = (1024, 10 * 1024, 100 * 1024, 1024 * 1024)
+_BUCKET_KEYS = ('1kb', '1_10kb', '10_100kb', '100kb_1mb', '1mb')
+
+# File magic numbers keyed on the first two header bytes:
+# (full magic length, full magic, file type)
+_FILE_MAGIC = {
+    b'MZ': (2, b'MZ', 'PE_executable'),           # Windows
+    b'\x7fE': (4, b'\x7fELF', 'ELF_executable'),  # Linux
+    b'PK': (2, b'PK', 'ZIP_archive'),             # Includes JAR, APK, DOCX, etc.
+    b'\x1f\x8b': (2, b'\x1f\x8b', 'GZIP_archive'),
+    b'Ra': (4, b'Rar!', 'RAR_archive'),
+    b'%P': (4, b'%PDF', 'PDF_document'),
+    b'\xff\xd8': (2, b'\xff\xd8', 'JPEG_image'),
+    b'\x89P': (8, b'\x89PNG\r\n\x1a\n', 'PNG_image'),
+    b'GI': (3, b'GIF', 'GIF_image'),
+    b'#!': (2, b'#!', 'shell_script'),
+}
+
+def dumps_json(data, pretty=True):
+    """Serialize data to UTF-8 JSON bytes, using orjson when available"""
+    if HAS_ORJSON:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=str, option=option)
+    # The stdlib encoder escapes non-ASCII by default, which makes the final
+    # UTF-8 encode a plain copy of an ASCII string
+    if pretty:
+        return json.dumps(data, indent=2, default=str).encode('utf-8')
+    return json.dumps(data, separators=(',', ':'), default=str).encode('utf-8')
+
+def loads_json(raw):
+    """Parse JSON from raw bytes, using orjson when available"""
+    if HAS_ORJSON:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
 class DionaeaLogProcessor:
+    # IPv4 networks treated as private/local, as (network, mask) integers:
+    # 10/8, 172.16/12, 192.168/16, 127/8 and 0/8
+    _PRIVATE_NETWORKS = (
+        (0x0A000000, 0xFF000000),
+        (0xAC100000, 0xFFF00000),
+        (0xC0A80000, 0xFFFF0000),
+        (0x7F000000, 0xFF000000),
+        (0x00000000, 0xFF000000),
+    )
+
+    # Connection patterns in Dionaea logs, compiled once for all processors,
+    # matched right after the fixed-width "[DDMMYYYY HH:MM:SS]" stamp and
+    # fused into a single alternation so each line needs only one match.
+    # Compiled over bytes so raw log lines are matched without decoding:
+    # groups 1/2 - connection ... from <ip> ... to ...:<port>
+    # groups 3/4 - accept ... from <ip> ... on ...<port>
+    _CONNECTION_PATTERN = re.compile(
+        rb'(?:.*connection.*from.*?(\d+\.\d+\.\d+\.\d+).*?to.*?:(\d+)'
+        rb'|.*accept.*from.*?(\d+\.\d+\.\d+\.\d+).*on.*?(\d+))'
+    )
+
     def __init__(self, 
                  log_path='/opt/dionaea/var/log/dionaea/dionaea.log',
                  output_dir='/root/honeypot_data',
@@ -34,7 +133,13 @@ class DionaeaLogProcessor:
         self.verbose = verbose
         self.incremental = incremental
         self.binaries_dir = Path(binaries_dir)
+        # Detected file types of already analyzed binaries
+        self.binary_types_path = self.output_dir / 'processed_binary_types.json'
         self.processed_log_path = self.output_dir / 'processed_dionaea.log'
+        self._position_fd = None
+        self.hash_file_path = self.output_dir / 'processed_hashes.bin'
+        # Text hash file written by older versions, superseded by the .bin file
+        self.legacy_hash_file_path = self.output_dir / 'processed_hashes.txt'
         
         # Persistent attack database to survive log rotations
         self.persistent_db_path = self.output_dir / 'persistent_attacks.json'
@@ -42,6 +147,7 @@ class DionaeaLogProcessor:
         
         # GeoIP setup
         self.geoip_reader = None
+        self._location_cache = {}
         if HAS_GEOIP:
             geoip_paths = [
                 '/opt/dionaea/var/lib/GeoIP/GeoLite2-City.mmdb',
@@ -61,10 +167,23 @@ class DionaeaLogProcessor:
                             print(f"Failed to load GeoIP from {path}: {e}")
                         continue
 
+    def __del__(self):
+        """Close the position marker file if it was opened"""
+        if getattr(self, '_position_fd', None) is not None:
+            os.close(self._position_fd)
+            self._position_fd = None
+
     def get_location(self, ip):
-        """Get geographic location of IP address"""
+        """Get geographic location of IP address, cached per IP"""
+        location = self._location_cache.get(ip)
+        if location is None:
+            location = self._location_cache[ip] = self._lookup_location(ip)
+        return location
+
+    def _lookup_location(self, ip):
+        """Look up geographic location of IP address"""
         # Skip private/local IPs
-        if ip.startswith(('192.168.', '10.', '172.16.', '127.', '0.0.0.0')):
+        if self.is_private_ip(ip):
             return {"country": "Private/Local", "city": "Local Network", "lat": 0, "lon": 0}
             
         if not self.geoip_reader:
@@ -72,27 +191,41 @@ class DionaeaLogProcessor:
         
         try:
             response = self.geoip_reader.city(ip)
+            # Fetch each record attribute once
+            location = response.location
+            lat = location.latitude
+            lon = location.longitude
+            # Country and city names repeat across many IPs, so share one
+            # string object per name
             return {
-                "country": response.country.name or "Unknown",
-                "city": response.city.name or "Unknown", 
-                "lat": float(response.location.latitude) if response.location.latitude else 0,
-                "lon": float(response.location.longitude) if response.location.longitude else 0
+                "country": sys.intern(response.country.name or "Unknown"),
+                "city": sys.intern(response.city.name or "Unknown"), 
+                "lat": float(lat) if lat else 0,
+                "lon": float(lon) if lon else 0
             }
         except:
             return {"country": "Unknown", "city": "Unknown", "lat": 0, "lon": 0}
 
+    def is_private_ip(self, ip):
+        """Check if an IPv4 address falls in a private/local network"""
+        try:
+            address = int.from_bytes(socket.inet_aton(ip), 'big')
+        except OSError:
+            return False
+        for network, mask in self._PRIVATE_NETWORKS:
+            if address & mask == network:
+                return True
+        return False
+
+    def line_fingerprint(self, line):
+        """Get a 64-bit integer fingerprint of a raw log line for deduplication"""
+        if HAS_XXHASH:
+            return xxhash.xxh3_64_intdigest(line)
+        return int.from_bytes(hashlib.blake2b(line, digest_size=8).digest(), 'big')
+
     def guess_service_from_port(self, port):
         """Guess service type from port number"""
-        port_map = {
-            '21': 'ftp', '22': 'ssh', '23': 'telnet', '25': 'smtp',
-            '53': 'dns', '80': 'http', '110': 'pop3', '135': 'epmap',
-            '139': 'netbios', '143': 'imap', '443': 'https', '445': 'smb',
-            '993': 'imaps', '995': 'pop3s', '1433': 'mssql', '3306': 'mysql',
-            '3389': 'rdp', '5060': 'sip', '1723': 'pptp', '5000': 'upnp',
-            '11211': 'memcache', '27017': 'mongo', '1883': 'mqtt',
-            '631': 'printer', '69': 'tftp'
-        }
-        return port_map.get(str(port), f'port-{port}')
+        return _PORT_MAP.get(int(port)) or sys.intern(f'port-{port}')
 
     def analyze_binaries(self):
         """Analyze captured malware binaries with UTF-8 safe operations"""
@@ -116,74 +249,75 @@ class DionaeaLogProcessor:
             return binary_stats
         
         try:
-            binary_files = []
-            for file_path in self.binaries_dir.iterdir():
-                if file_path.is_file():
-                    try:
-                        stat = file_path.stat()
-                        binary_info = {
-                            'filename': file_path.name,
-                            'size': stat.st_size,
-                            'timestamp': datetime.datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                            'hash': file_path.name if len(file_path.name) == 32 else 'unknown',
-                            'type': 'binary'
-                        }
-                        
-                        # Try to detect file type by reading first few bytes with UTF-8 safety
-                        try:
-                            with open(file_path, 'rb') as f:
-                                header = f.read(16)
-                                file_type = self.detect_file_type(header)
-                                binary_info['file_type'] = file_type
-                        except Exception as e:
-                            if self.verbose:
-                                print(f"Error reading binary {file_path.name}: {e}")
-                            binary_info['file_type'] = 'unknown'
-                        
-                        binary_files.append(binary_info)
-                        
-                    except Exception as e:
-                        if self.verbose:
-                            print(f"Error analyzing binary {file_path.name}: {e}")
+            # Aggregates are updated online during the single directory pass
+            total_binaries = 0
+            total_size = 0
+            min_size = max_size = None
+            size_counts = [0] * len(_BUCKET_KEYS)
+            type_counter = Counter()
+            recent = []  # Min-heap of the 10 newest: (timestamp, -scan order, info)
+            
+            # scandir entries carry the file type from the directory listing,
+            # so only one stat and one raw read are needed per binary
+            with os.scandir(self.binaries_dir) as entries:
+                files = [entry for entry in entries if entry.is_file()]
+            
+            # File types detected on earlier runs, keyed by filename, so only
+            # new or changed binaries need their header read
+            known_types = self.load_binary_types()
+            binary_types = {}
+            
+            # The per-file stat and header read are syscall bound, so probe
+            # files on a small thread pool; map keeps the scan order
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                for binary_info in executor.map(self._probe_binary, files, repeat(known_types)):
+                    if binary_info is None:
                         continue
+                    if binary_info['file_type'] != 'unknown':
+                        binary_types[binary_info['filename']] = [
+                            binary_info['size'], binary_info['timestamp'], binary_info['file_type']
+                        ]
+                    size = binary_info['size']
+                    total_binaries += 1
+                    total_size += size
+                    if min_size is None or size < min_size:
+                        min_size = size
+                    if max_size is None or size > max_size:
+                        max_size = size
+                    size_counts[bisect_right(_BUCKET_EDGES, size)] += 1
+                    type_counter[binary_info['file_type']] += 1
+                    
+                    # Keep only the newest binaries; earlier scan order wins ties
+                    heap_item = (binary_info['timestamp'], -total_binaries, binary_info)
+                    if len(recent) < 10:
+                        heapq.heappush(recent, heap_item)
+                    else:
+                        heapq.heappushpop(recent, heap_item)
             
-            # Sort by timestamp (newest first)
-            binary_files.sort(key=lambda x: x['timestamp'], reverse=True)
+            # Rewriting the cache also forgets binaries that were removed
+            if binary_types != known_types:
+                if self.save_json_file(self.binary_types_path.name, binary_types, atomic=False) is not None and self.verbose:
+                    print(f"Saved {self.binary_types_path.name}")
             
-            binary_stats['total_binaries'] = len(binary_files)
-            binary_stats['recent_binaries'] = binary_files[:10]  # Last 10 binaries
+            binary_stats['total_binaries'] = total_binaries
+            # Last 10 binaries, newest first
+            binary_stats['recent_binaries'] = [item[2] for item in sorted(recent, reverse=True)]
             
             # Calculate statistics
-            sizes = [b['size'] for b in binary_files]
-            if sizes:
+            if total_binaries:
                 binary_stats['binary_sizes'] = {
-                    'min': min(sizes),
-                    'max': max(sizes),
-                    'avg': sum(sizes) // len(sizes),
-                    'total': sum(sizes)
+                    'min': min_size,
+                    'max': max_size,
+                    'avg': total_size // total_binaries,
+                    'total': total_size
                 }
             
             # File type and size distribution
-            for binary in binary_files:
-                # File type counting
-                file_type = binary.get('file_type', 'unknown')
-                binary_stats['file_types'][file_type] = binary_stats['file_types'].get(file_type, 0) + 1
-                
-                # Size distribution
-                size = binary['size']
-                if size < 1024:  # < 1KB
-                    binary_stats['size_distribution']['1kb'] += 1
-                elif size < 10 * 1024:  # 1-10KB
-                    binary_stats['size_distribution']['1_10kb'] += 1
-                elif size < 100 * 1024:  # 10-100KB
-                    binary_stats['size_distribution']['10_100kb'] += 1
-                elif size < 1024 * 1024:  # 100KB-1MB
-                    binary_stats['size_distribution']['100kb_1mb'] += 1
-                else:  # > 1MB
-                    binary_stats['size_distribution']['1mb'] += 1
+            binary_stats['file_types'] = dict(type_counter)
+            binary_stats['size_distribution'] = dict(zip(_BUCKET_KEYS, size_counts))
             
             if self.verbose:
-                print(f"Analyzed {len(binary_files)} binary files")
+                print(f"Analyzed {total_binaries} binary files")
                 
         except Exception as e:
             if self.verbose:
@@ -191,44 +325,65 @@ class DionaeaLogProcessor:
         
         return binary_stats
 
+    def load_binary_types(self):
+        """Load cached {filename: [size, timestamp, file_type]} binary types"""
+        try:
+            binary_types = self.load_json_file(self.binary_types_path.name)
+            if isinstance(binary_types, dict):
+                return binary_types
+        except Exception as e:
+            if self.verbose:
+                print(f"Error loading binary type cache: {e}")
+        return {}
+
+    def _probe_binary(self, entry, known_types):
+        """Stat a binary and sniff its file type, None if it can't be analyzed"""
+        try:
+            stat = entry.stat()
+            binary_info = {
+                'filename': entry.name,
+                'size': stat.st_size,
+                'timestamp': datetime.datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                'hash': entry.name if len(entry.name) == 32 else 'unknown',
+                'type': 'binary'
+            }
+            
+            # Reuse the cached type while size and mtime are unchanged
+            known = known_types.get(entry.name)
+            if known and known[0] == binary_info['size'] and known[1] == binary_info['timestamp']:
+                binary_info['file_type'] = known[2]
+                return binary_info
+            
+            # Try to detect file type by reading first few bytes
+            try:
+                fd = os.open(entry.path, os.O_RDONLY)
+                try:
+                    header = os.read(fd, 16)
+                finally:
+                    os.close(fd)
+                binary_info['file_type'] = self.detect_file_type(header)
+            except Exception as e:
+                if self.verbose:
+                    print(f"Error reading binary {entry.name}: {e}")
+                binary_info['file_type'] = 'unknown'
+            
+            return binary_info
+            
+        except Exception as e:
+            if self.verbose:
+                print(f"Error analyzing binary {entry.name}: {e}")
+            return None
+
     def detect_file_type(self, header):
         """Detect file type from binary header"""
         if len(header) < 2:
             return 'unknown'
         
-        # PE executable (Windows)
-        if header[:2] == b'MZ':
-            return 'PE_executable'
-        # ELF executable (Linux)
-        elif header[:4] == b'\x7fELF':
-            return 'ELF_executable'
-        # ZIP archive (includes JAR, APK, DOCX, etc.)
-        elif header[:2] == b'PK':
-            return 'ZIP_archive'
-        # GZIP compressed
-        elif header[:2] == b'\x1f\x8b':
-            return 'GZIP_archive'
-        # RAR archive
-        elif header[:4] == b'Rar!':
-            return 'RAR_archive'
-        # PDF document
-        elif header[:4] == b'%PDF':
-            return 'PDF_document'
-        # JPEG image
-        elif header[:2] == b'\xff\xd8':
-            return 'JPEG_image'
-        # PNG image
-        elif header[:8] == b'\x89PNG\r\n\x1a\n':
-            return 'PNG_image'
-        # GIF image
-        elif header[:3] == b'GIF':
-            return 'GIF_image'
-        # Shell script
-        elif header[:2] == b'#!':
-            return 'shell_script'
-        # Unknown binary
-        else:
-            return 'unknown_binary'
+        # Single dict lookup on the first two bytes, then confirm the full magic
+        magic = _FILE_MAGIC.get(header[:2])
+        if magic and header[:magic[0]] == magic[1]:
+            return magic[2]
+        return 'unknown_binary'
 
     def load_persistent_attacks(self):
         """Load persistent attack database that survives log rotations"""
@@ -237,25 +392,23 @@ class DionaeaLogProcessor:
         try:
             # Try to load from main database
             if self.persistent_db_path.exists():
-                with open(self.persistent_db_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if isinstance(data, list):
-                        persistent_attacks = data
-                    else:
-                        # Handle old format
-                        persistent_attacks = data.get('attacks', [])
+                data = loads_json(self.persistent_db_path.read_bytes())
+                if isinstance(data, list):
+                    persistent_attacks = data
+                else:
+                    # Handle old format
+                    persistent_attacks = data.get('attacks', [])
                         
                 if self.verbose:
                     print(f"Loaded {len(persistent_attacks)} attacks from persistent database")
                     
             # Try backup if main fails or is empty
             elif self.backup_db_path.exists():
-                with open(self.backup_db_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if isinstance(data, list):
-                        persistent_attacks = data
-                    else:
-                        persistent_attacks = data.get('attacks', [])
+                data = loads_json(self.backup_db_path.read_bytes())
+                if isinstance(data, list):
+                    persistent_attacks = data
+                else:
+                    persistent_attacks = data.get('attacks', [])
                         
                 if self.verbose:
                     print(f"Loaded {len(persistent_attacks)} attacks from backup database")
@@ -269,23 +422,28 @@ class DionaeaLogProcessor:
     def save_persistent_attacks(self, attacks):
         """Save attacks to persistent database with backup"""
         try:
-            # Create backup of current database before overwriting
+            # Create backup of current database before overwriting. A hard link
+            # is enough since the database is only ever replaced, never rewritten
+            # in place, so the backup keeps pointing at the old contents.
             if self.persistent_db_path.exists():
-                import shutil
-                shutil.copy2(self.persistent_db_path, self.backup_db_path)
+                if self.backup_db_path.exists():
+                    os.unlink(self.backup_db_path)
+                try:
+                    os.link(self.persistent_db_path, self.backup_db_path)
+                except OSError:
+                    shutil.copy2(self.persistent_db_path, self.backup_db_path)
                 if self.verbose:
                     print(f"Created backup of persistent database")
             
-            # Write to temporary file first to avoid corruption
+            # Write to temporary file first to avoid corruption; the database
+            # is never read by people, so it is stored compact
             temp_path = self.output_dir / 'persistent_attacks_temp.json'
-            with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(attacks, f, indent=2, default=str, ensure_ascii=False)
+            temp_path.write_bytes(dumps_json(attacks, pretty=False))
             
             # Verify the temp file was written correctly
             if temp_path.exists() and temp_path.stat().st_size > 0:
                 # Atomically move temp file to final location
-                import shutil
-                shutil.move(temp_path, self.persistent_db_path)
+                os.replace(temp_path, self.persistent_db_path)
                 if self.verbose:
                     print(f"Saved {len(attacks)} attacks to persistent database")
             else:
@@ -297,13 +455,35 @@ class DionaeaLogProcessor:
             # Try to restore from backup if save failed
             if self.backup_db_path.exists():
                 try:
-                    import shutil
-                    shutil.copy2(self.backup_db_path, self.persistent_db_path)
-                    if self.verbose:
-                        print("Restored persistent database from backup")
+                    if (self.persistent_db_path.exists()
+                            and os.path.samefile(self.backup_db_path, self.persistent_db_path)):
+                        # The backup is a hard link to the database, which the
+                        # failed save never replaced, so there is nothing to restore
+                        if self.verbose:
+                            print("Persistent database left unchanged")
+                    else:
+                        # Link the backup in under a temporary name and swap it
+                        # into place, keeping the backup itself intact
+                        restore_path = self.output_dir / 'persistent_attacks_temp.json'
+                        if restore_path.exists():
+                            os.unlink(restore_path)
+                        try:
+                            os.link(self.backup_db_path, restore_path)
+                        except OSError:
+                            shutil.copy2(self.backup_db_path, restore_path)
+                        os.replace(restore_path, self.persistent_db_path)
+                        if self.verbose:
+                            print("Restored persistent database from backup")
                 except Exception as restore_error:
                     print(f"Failed to restore from backup: {restore_error}")
 
+    def load_json_file(self, filename):
+        """Load a JSON data file from the output directory, None if missing"""
+        filepath = self.output_dir / filename
+        if not filepath.exists():
+            return None
+        return loads_json(filepath.read_bytes())
+
     def load_existing_data(self):
         """Load existing JSON data files for incremental updates"""
         existing_data = {
@@ -314,23 +494,30 @@ class DionaeaLogProcessor:
         }
         
         try:
-            # First try to load from persistent database
-            persistent_attacks = self.load_persistent_attacks()
-            if persistent_attacks:
-                existing_data['attacks'] = persistent_attacks
-            else:
-                # Fallback to regular attacks.json
-                attacks_file = self.output_dir / 'attacks.json'
-                if attacks_file.exists():
-                    with open(attacks_file, 'r', encoding='utf-8') as f:
-                        existing_data['attacks'] = json.load(f)
-                    
-            # Load existing stats
-            for stat_type in ['summary', 'hourly_stats', 'daily_stats']:
-                stat_file = self.output_dir / f'{stat_type}.json'
-                if stat_file.exists():
-                    with open(stat_file, 'r', encoding='utf-8') as f:
-                        existing_data[stat_type] = json.load(f)
+            # Read the persistent database and stat files concurrently so
+            # their disk reads overlap
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                attacks_future = executor.submit(self.load_persistent_attacks)
+                stat_futures = {
+                    stat_type: executor.submit(self.load_json_file, f'{stat_type}.json')
+                    for stat_type in ('summary', 'hourly_stats', 'daily_stats')
+                }
+                
+                # First try to load from persistent database
+                persistent_attacks = attacks_future.result()
+                if persistent_attacks:
+                    existing_data['attacks'] = persistent_attacks
+                else:
+                    # Fallback to regular attacks.json
+                    attacks = self.load_json_file('attacks.json')
+                    if attacks is not None:
+                        existing_data['attacks'] = attacks
+                
+                # Load existing stats
+                for stat_type, future in stat_futures.items():
+                    stats = future.result()
+                    if stats is not None:
+                        existing_data[stat_type] = stats
                         
         except Exception as e:
             if self.verbose:
@@ -338,61 +525,18 @@ class DionaeaLogProcessor:
                 
         return existing_data
 
-    def get_last_processed_position(self):
-        """Get the last processed position in the log file"""
-        if not self.processed_log_path.exists():
-            return 0
-            
-        try:
-            with open(self.processed_log_path, 'r') as f:
-                return int(f.read().strip())
-        except:
-            return 0
-
     def save_processed_position(self, position):
         """Save the current processed position in the log file"""
         try:
-            with open(self.processed_log_path, 'w') as f:
-                f.write(str(position))
+            # Keep the marker file open and overwrite a fixed-width value in
+            # place, so each checkpoint is a single pwrite with no truncate
+            if self._position_fd is None:
+                self._position_fd = os.open(self.processed_log_path, os.O_WRONLY | os.O_CREAT, 0o644)
+            os.pwrite(self._position_fd, f"{position:020d}".encode(), 0)
         except Exception as e:
             if self.verbose:
                 print(f"Error saving processed position: {e}")
 
-    def detect_log_rotation(self):
-        """Detect if log file was rotated or deleted"""
-        if not os.path.exists(self.log_path):
-            if self.verbose:
-                print("Log file not found - possible rotation or deletion")
-            return True
-            
-        try:
-            # Check if log file is significantly smaller than expected
-            file_size = os.path.getsize(self.log_path)
-            last_position = self.get_last_processed_position()
-            
-            if last_position > file_size and file_size < 1000:  # File is much smaller
-                if self.verbose:
-                    print("Log file appears to have been rotated (size decreased significantly)")
-                return True
-                
-            # Check file modification time
-            if self.processed_log_path.exists():
-                log_mtime = os.path.getmtime(self.log_path)
-                processed_mtime = os.path.getmtime(self.processed_log_path)
-                
-                # If log is much newer (more than 1 hour difference), likely rotated
-                if (log_mtime - processed_mtime) > 3600:
-                    if self.verbose:
-                        print("Log file appears to have been rotated (timestamp difference)")
-                    return True
-                    
-        except Exception as e:
-            if self.verbose:
-                print(f"Error detecting log rotation: {e}")
-            return True
-            
-        return False
-
     def clear_old_log_data(self):
         """Clear old log data to keep processing fast"""
         if not os.path.exists(self.log_path):
@@ -404,103 +548,126 @@ class DionaeaLogProcessor:
             
             # Only truncate if file is larger than 1MB or has more than 10000 lines
             if file_stats.st_size > 1000000:  # 1MB
+                # Stream the file keeping only a bounded tail window (one extra
+                # line tells us whether there is anything to truncate)
                 with open(self.log_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines = f.readlines()
+                    tail = deque(f, maxlen=10001)
                     
-                if len(lines) > 10000:
+                if len(tail) > 10000:
                     # Keep last 10000 lines
+                    tail.popleft()
                     with open(self.log_path, 'w', encoding='utf-8') as f:
-                        f.writelines(lines[-10000:])
+                        f.writelines(tail)
                         
                     # Reset processed position since we truncated the file
                     self.save_processed_position(0)
                     
                     # Clear processed hashes since file was truncated
-                    hash_file = self.output_dir / 'processed_hashes.txt'
-                    if hash_file.exists():
-                        hash_file.unlink()
+                    if self.hash_file_path.exists():
+                        self.hash_file_path.unlink()
                     
                     if self.verbose:
-                        print(f"Truncated log file from {len(lines)} to 10000 lines")
+                        print("Truncated log file to last 10000 lines")
                         
         except Exception as e:
             if self.verbose:
                 print(f"Error clearing old log data: {e}")
 
-    def get_last_processed_position(self):
-        """Get the last processed position in the log file"""
-        if not self.processed_log_path.exists():
-            return 0
-            
+    def get_log_state(self):
+        """Get (last processed position, rotated) for the log, None if it is missing
+        
+        The log and the position marker are each stat'ed once, and both the
+        rotation check and the position validation work from those results.
+        """
+        try:
+            log_stat = os.stat(self.log_path)
+        except OSError:
+            return None
+        
+        try:
+            processed_stat = os.stat(self.processed_log_path)
+        except OSError:
+            return 0, False
+        
+        # If log is much newer (more than 1 hour difference), likely rotated
+        if (log_stat.st_mtime - processed_stat.st_mtime) > 3600:
+            if self.verbose:
+                print("Log file appears to have been rotated (timestamp difference)")
+            return 0, True
+        
+        # If log is older than processed file, start from beginning
+        if log_stat.st_mtime < processed_stat.st_mtime:
+            return 0, False
+        
         try:
-            # Check if log file was modified since last processing
-            if os.path.exists(self.log_path):
-                log_mtime = os.path.getmtime(self.log_path)
-                processed_mtime = os.path.getmtime(self.processed_log_path)
-                
-                # If log is older than processed file, start from beginning
-                if log_mtime < processed_mtime:
-                    return 0
-            
             with open(self.processed_log_path, 'r') as f:
                 position = int(f.read().strip())
-                
-                # Validate position against current file size
-                if os.path.exists(self.log_path):
-                    file_size = os.path.getsize(self.log_path)
-                    if position > file_size:
-                        return 0
-                        
-                return position
         except:
-            return 0
+            return 0, False
+        
+        # Validate position against current file size
+        if position > log_stat.st_size:
+            return 0, False
+        return position, False
 
     def parse_dionaea_log(self):
         """Parse Dionaea log file with incremental processing and log rotation detection"""
         new_attacks = []
+        # (timestamp, src_ip, dst_port) of matched lines; locations are
+        # resolved once per distinct IP after the scan
+        matches = []
         
-        # Check for log rotation first
-        log_rotated = self.detect_log_rotation()
+        # Check for log rotation first; this also reads the last position
+        log_state = self.get_log_state()
         
-        if not os.path.exists(self.log_path):
+        if log_state is None:
             if self.verbose:
                 print(f"Log file not found: {self.log_path}")
             # Reset position tracking if log file is missing
             self.save_processed_position(0)
             return new_attacks
         
+        last_position, log_rotated = log_state
+        
         # Reset position tracking if log was rotated
         if log_rotated:
             if self.verbose:
                 print("Log rotation detected, starting from beginning of new log")
             self.save_processed_position(0)
             # Clear hash file since we're starting fresh
-            hash_file = self.output_dir / 'processed_hashes.txt'
-            if hash_file.exists():
-                hash_file.unlink()
+            if self.hash_file_path.exists():
+                self.hash_file_path.unlink()
         
-        # Get last processed position for incremental updates
-        last_position = self.get_last_processed_position() if self.incremental else 0
+        # Non-incremental runs always start from the beginning
+        if not self.incremental:
+            last_position = 0
         current_position = last_position
         
-        # Keep track of processed line hashes to avoid reprocessing
+        # Keep track of processed connection line hashes to avoid reprocessing;
+        # the set answers membership and the bounded deque remembers insertion
+        # order so only the most recent 10000 fingerprints are persisted
         processed_hashes = set()
-        hash_file = self.output_dir / 'processed_hashes.txt'
+        hash_window = deque(maxlen=10000)
+        hash_file = self.hash_file_path
+        # The hash file is only rewritten when the window actually changed
+        hashes_changed = False
         
-        # Load existing processed hashes (skip if log was rotated)
+        # Load existing processed hashes (skip if log was rotated), stored as
+        # a flat array of unsigned 64-bit fingerprints
         if hash_file.exists() and self.incremental and not log_rotated:
             try:
-                with open(hash_file, 'r') as f:
-                    processed_hashes = set(line.strip() for line in f if line.strip())
+                stored_hashes = array('Q')
+                stored_hashes.frombytes(hash_file.read_bytes())
+                hash_window.extend(stored_hashes)
+                processed_hashes = set(hash_window)
             except Exception as e:
                 if self.verbose:
                     print(f"Error loading processed hashes: {e}")
         
         try:
-            with open(self.log_path, 'r', encoding='utf-8', errors='ignore') as f:
+            with open(self.log_path, 'rb') as f:
                 # Get file size
-                f.seek(0, 2)  # Seek to end
-                file_size = f.tell()
+                file_size = os.fstat(f.fileno()).st_size
                 
                 # If last position is beyond file size, reset to 0 (file was truncated)
                 if last_position > file_size:
@@ -508,99 +675,100 @@ class DionaeaLogProcessor:
                     current_position = 0
                     # Clear processed hashes since file was truncated
                     processed_hashes.clear()
+                    hash_window.clear()
+                    hashes_changed = True
                 
-                # Skip to last processed position
-                f.seek(last_position)
-                
-                # Read line by line without using iterator
-                while True:
-                    line_start = f.tell()
-                    line = f.readline()
-                    
-                    if not line:  # End of file
-                        current_position = f.tell()
-                        break
-                    
-                    current_position = f.tell()
-                    
-                    # Create a hash of the line to avoid reprocessing
-                    import hashlib
-                    line_hash = hashlib.md5(line.encode()).hexdigest()
-                    
-                    # Skip if we've already processed this line (unless log was rotated)
-                    if not log_rotated and line_hash in processed_hashes:
-                        continue
-                    
-                    # Look for connection patterns in Dionaea logs
-                    patterns = [
-                        # Pattern for connection accept messages
-                        r'\[(\d{2})(\d{2})(\d{4}) (\d{2}:\d{2}:\d{2})\].*connection.*from.*?(\d+\.\d+\.\d+\.\d+).*?to.*?:(\d+)',
-                        r'\[(\d{2})(\d{2})(\d{4}) (\d{2}:\d{2}:\d{2})\].*accept.*from.*?(\d+\.\d+\.\d+\.\d+).*on.*?(\d+)',
-                    ]
-                    
-                    for pattern in patterns:
-                        match = re.search(pattern, line)
-                        if match:
-                            try:
-                                # Parse the timestamp (DDMMYYYY format)
-                                day, month, year, time_str = match.group(1), match.group(2), match.group(3), match.group(4)
-                                src_ip = match.group(5)
-                                dst_port = match.group(6)
-                                
-                                # Create datetime object
-                                dt = datetime.datetime(
-                                    int(year), int(month), int(day),
-                                    int(time_str[0:2]), int(time_str[3:5]), int(time_str[6:8])
-                                )
-                                
-                                service = self.guess_service_from_port(dst_port)
-                                location = self.get_location(src_ip)
-                                
-                                attack = {
-                                    'timestamp': dt.isoformat(),
-                                    'src_ip': src_ip,
-                                    'src_port': "unknown",  # Not always available in logs
-                                    'dst_port': dst_port,
-                                    'service': service,
-                                    'country': location['country'],
-                                    'city': location['city'],
-                                    'lat': location['lat'],
-                                    'lon': location['lon']
-                                }
-                                
-                                new_attacks.append(attack)
+                # Memory-map the log and split lines with mm.find (a C-level
+                # memchr) from the last processed position; filters and the
+                # regex run on the raw bytes and only matched fields are decoded
+                if file_size > last_position:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        while current_position < file_size:
+                            newline = mm.find(b'\n', current_position, file_size)
+                            line_end = file_size if newline == -1 else newline + 1
+                            raw_line = mm[current_position:line_end]
+                            current_position = line_end
+                            
+                            # Cheap pre-filters before any regex work: connection lines
+                            # start with a "[DDMMYYYY HH:MM:SS]" stamp and mention
+                            # either "connection" or "accept"
+                            if not (raw_line[:1] == b'[' and raw_line[9:10] == b' '
+                                    and raw_line[12:13] == b':' and raw_line[15:16] == b':'
+                                    and raw_line[18:19] == b']' and raw_line[1:9].isdigit()
+                                    and raw_line[10:12].isdigit() and raw_line[13:15].isdigit()
+                                    and raw_line[16:18].isdigit()
+                                    and (b'connection' in raw_line or b'accept' in raw_line)):
+                                continue
+                            
+                            match = self._CONNECTION_PATTERN.match(raw_line, 19)
+                            if not match:
+                                continue
+                            
+                            # Fingerprint the line to avoid reprocessing; only lines
+                            # that yield an attack need one
+                            line_hash = self.line_fingerprint(raw_line)
+                            
+                            # Skip if we've already processed this line (unless log was rotated)
+                            if line_hash in processed_hashes:
+                                if not log_rotated:
+                                    continue
+                            else:
                                 processed_hashes.add(line_hash)
-                                break
+                                hash_window.append(line_hash)
+                                hashes_changed = True
+                            
+                            try:
+                                # Rearrange the validated DDMMYYYY stamp straight into
+                                # ISO format; the stamp and captures are all ASCII digits
+                                stamp = raw_line[1:18].decode('ascii')
+                                timestamp = f"{stamp[4:8]}-{stamp[2:4]}-{stamp[0:2]}T{stamp[9:17]}"
+                                src_ip = (match.group(1) or match.group(3)).decode('ascii')
+                                dst_port = (match.group(2) or match.group(4)).decode('ascii')
+                                matches.append((timestamp, src_ip, dst_port))
                                 
                             except Exception as e:
                                 if self.verbose:
-                                    print(f"Error parsing line: {line.strip()}")
+                                    print(f"Error parsing line: {raw_line.decode('utf-8', 'ignore').strip()}")
                                     print(f"Error: {e}")
-                                continue
-                    
-                    # Add non-matching lines to processed hashes too
-                    processed_hashes.add(line_hash)
                 
                 # Save current position and processed hashes
                 if self.incremental:
                     self.save_processed_position(current_position)
                     
-                    # Save processed hashes (keep only last 10000 to manage file size)
-                    if len(processed_hashes) > 10000:
-                        processed_hashes = set(list(processed_hashes)[-10000:])
-                    
-                    try:
-                        with open(hash_file, 'w') as f:
-                            for h in processed_hashes:
-                                f.write(f"{h}\n")
-                    except Exception as e:
-                        if self.verbose:
-                            print(f"Error saving processed hashes: {e}")
+                    # Save processed hashes (the window keeps only the last 10000);
+                    # runs that saw no new lines leave the file untouched
+                    if hashes_changed:
+                        try:
+                            with open(hash_file, 'wb') as f:
+                                array('Q', hash_window).tofile(f)
+                            # Drop the old text hash file once the .bin replaces it
+                            if self.legacy_hash_file_path.exists():
+                                self.legacy_hash_file_path.unlink()
+                        except Exception as e:
+                            if self.verbose:
+                                print(f"Error saving processed hashes: {e}")
                                 
         except Exception as e:
             if self.verbose:
                 print(f"Error reading {self.log_path}: {e}")
             
+        # Resolve each distinct source IP and port once, then build the attacks
+        locations = {src_ip: self.get_location(src_ip) for src_ip in {item[1] for item in matches}}
+        services = {dst_port: self.guess_service_from_port(dst_port) for dst_port in {item[2] for item in matches}}
+        for timestamp, src_ip, dst_port in matches:
+            location = locations[src_ip]
+            new_attacks.append({
+                'timestamp': timestamp,
+                'src_ip': src_ip,
+                'src_port': "unknown",  # Not always available in logs
+                'dst_port': dst_port,
+                'service': services[dst_port],
+                'country': location['country'],
+                'city': location['city'],
+                'lat': location['lat'],
+                'lon': location['lon']
+            })
+            
         if self.verbose and new_attacks:
             print(f"Parsed {len(new_attacks)} new log entries")
             
@@ -659,23 +827,22 @@ class DionaeaLogProcessor:
         if self.verbose and existing_data['attacks']:
             print(f"Loaded {len(existing_data['attacks'])} existing attacks")
         
-        # Create a set of existing attack signatures for deduplication
-        existing_signatures = set()
-        for attack in existing_data['attacks']:
-            key = f"{attack['timestamp']}_{attack['src_ip']}_{attack['dst_port']}"
-            existing_signatures.add(key)
+        # Create a set of existing attack signatures for deduplication; the
+        # (timestamp, src_ip, dst_port) tuples are built by itemgetter in C
+        attack_signature = itemgetter('timestamp', 'src_ip', 'dst_port')
+        existing_signatures = set(map(attack_signature, existing_data['attacks']))
         
         # Parse new attacks from log (before truncation to maintain position tracking)
         new_attacks = self.parse_dionaea_log()
         
         # Filter out attacks that already exist (true deduplication)
-        truly_new_attacks = []
-        for attack in new_attacks:
-            key = f"{attack['timestamp']}_{attack['src_ip']}_{attack['dst_port']}"
-            if key not in existing_signatures:
-                truly_new_attacks.append(attack)
-                if self.verbose:
-                    print(f"Found truly new attack: {attack['src_ip']} -> {attack['dst_port']} ({attack['service']})")
+        truly_new_attacks = [
+            attack for attack in new_attacks
+            if attack_signature(attack) not in existing_signatures
+        ]
+        if self.verbose:
+            for attack in truly_new_attacks:
+                print(f"Found truly new attack: {attack['src_ip']} -> {attack['dst_port']} ({attack['service']})")
         
         # Clear old log data AFTER processing to maintain incremental tracking
         self.clear_old_log_data()
@@ -687,14 +854,24 @@ class DionaeaLogProcessor:
             truly_new_attacks = self.create_sample_data()
             existing_data = {'attacks': [], 'summary': {}, 'hourly_stats': {}, 'daily_stats': {}}
         
-        # Combine existing and truly new attacks
-        all_attacks = existing_data['attacks'] + truly_new_attacks
+        existing_attacks = existing_data['attacks']
+        if truly_new_attacks or len(existing_attacks) > 2000:
+            # Combine existing and truly new attacks, sort by timestamp and
+            # keep last 2000 attacks to manage file size
+            attacks = sorted(existing_attacks + truly_new_attacks, key=itemgetter('timestamp'))[-2000:]
+        else:
+            # Nothing new: the saved attacks were sorted and capped when written
+            attacks = existing_attacks
         
-        # Sort by timestamp and keep last 2000 attacks to manage file size
-        attacks = sorted(all_attacks, key=lambda x: x['timestamp'])[-2000:]
+        # With nothing new, the persistent database and the attack/stat files
+        # would be rewritten byte-identical; only the summary needs refreshing
+        unchanged = (self.incremental and attacks is existing_attacks
+                     and self.persistent_db_path.exists()
+                     and all((self.output_dir / filename).exists() for filename in _DASHBOARD_FILES))
         
         # Save to persistent database to survive log rotations
-        self.save_persistent_attacks(attacks)
+        if not unchanged:
+            self.save_persistent_attacks(attacks)
         
         if self.verbose:
             print(f"Total attacks after adding new ones: {len(attacks)}")
@@ -702,28 +879,31 @@ class DionaeaLogProcessor:
         # Analyze collected binaries
         binary_stats = self.analyze_binaries()
         
-        # Generate statistics from all attacks
-        ip_stats = Counter()
-        service_stats = Counter()
-        country_stats = Counter()
-        hourly_stats = defaultdict(int)
-        daily_stats = defaultdict(int)
-        
-        for attack in attacks:
-            ip_stats[attack['src_ip']] += 1
-            service_stats[attack['service']] += 1
-            country_stats[attack['country']] += 1
-            
-            try:
-                dt = datetime.datetime.fromisoformat(attack['timestamp'].replace('Z', ''))
-                hour_key = dt.strftime('%Y-%m-%d %H:00')
-                day_key = dt.strftime('%Y-%m-%d')
-                hourly_stats[hour_key] += 1
-                daily_stats[day_key] += 1
-            except Exception as e:
-                if self.verbose:
-                    print(f"Error parsing timestamp {attack['timestamp']}: {e}")
-                pass
+        # Stats describe the retained window (existing plus new attacks, capped
+        # above), so they are rebuilt here rather than accumulated while parsing,
+        # which only sees new lines and cannot account for evicted attacks.
+        # Extract the counted fields into parallel columns in one sweep
+        src_ips, services, countries, timestamps = (
+            list(zip(*map(itemgetter('src_ip', 'service', 'country', 'timestamp'), attacks)))
+            or [(), (), (), ()]
+        )
+        
+        # Generate statistics from all attacks, one Counter pass per column
+        ip_stats = Counter(src_ips)
+        service_stats = Counter(services)
+        country_stats = Counter(countries)
+        
+        # Bursty attacks share timestamps, so bucket each distinct one only once
+        timestamp_keys = {timestamp: self.get_time_buckets(timestamp) for timestamp in dict.fromkeys(timestamps)}
+        time_buckets = [keys for keys in map(timestamp_keys.get, timestamps) if keys]
+        hourly_stats = Counter(hour_key for hour_key, _ in time_buckets)
+        daily_stats = Counter(day_key for _, day_key in time_buckets)
+        
+        # One clock snapshot for the whole summary; only today's and
+        # yesterday's buckets can fall in the last 24 hours
+        now = datetime.datetime.now()
+        last_24h_attacks = (daily_stats.get(now.strftime('%Y-%m-%d'), 0)
+                            + daily_stats.get((now - datetime.timedelta(days=1)).strftime('%Y-%m-%d'), 0))
         
         # Generate summary with binaries instead of services count
         summary = {
@@ -732,28 +912,42 @@ class DionaeaLogProcessor:
             'unique_countries': len(country_stats),
             'total_binaries': binary_stats['total_binaries'],  # Changed from services_count
             'top_attackers': dict(ip_stats.most_common(15)),
-            'services_targeted': dict(service_stats.most_common()),
-            'countries': dict(country_stats.most_common()),
-            'last_updated': datetime.datetime.now().isoformat(),
-            'last_24h_attacks': sum(v for k, v in daily_stats.items() if k >= (datetime.datetime.now() - datetime.timedelta(days=1)).strftime('%Y-%m-%d')),
+            # The dashboard sorts these itself, so skip the full most_common() sort
+            'services_targeted': dict(service_stats),
+            'countries': dict(country_stats),
+            'last_updated': now.isoformat(),
+            'last_24h_attacks': last_24h_attacks,
             'new_attacks_this_run': len(truly_new_attacks),
             'binary_stats': binary_stats  # Add full binary stats
         }
 
-        # Save data files (update existing files)
-        self.save_json_file('attacks.json', attacks[-1000:])  # Keep last 1000 for display
-        self.save_json_file('summary.json', summary)
-        self.save_json_file('hourly_stats.json', dict(hourly_stats))
-        self.save_json_file('daily_stats.json', dict(daily_stats))
-        
-        # Verify files were saved correctly
-        files_to_check = ['attacks.json', 'summary.json', 'hourly_stats.json', 'daily_stats.json']
-        for filename in files_to_check:
-            filepath = self.output_dir / filename
-            if not filepath.exists():
+        # Keep last 1000 for display, reusing the list itself when already small
+        display_attacks = attacks if len(attacks) <= 1000 else attacks[-1000:]
+        
+        # Save data files (update existing files); the writes are independent,
+        # so overlap them on a small thread pool
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            # Stats are regenerated every run, so they are written in place
+            saves = {
+                'summary.json': executor.submit(self.save_json_file, 'summary.json', summary, pretty=True, atomic=False)
+            }
+            if unchanged:
+                if self.verbose:
+                    print("No new attacks, keeping existing attack and stats files")
+            else:
+                saves['attacks.json'] = executor.submit(self.save_json_file, 'attacks.json', display_attacks)
+                # Counters are dict subclasses and serialize without a copy
+                saves['hourly_stats.json'] = executor.submit(self.save_json_file, 'hourly_stats.json', hourly_stats, atomic=False)
+                saves['daily_stats.json'] = executor.submit(self.save_json_file, 'daily_stats.json', daily_stats, atomic=False)
+        
+        # Verify files were saved correctly from the sizes the writes reported
+        for filename, future in saves.items():
+            file_size = future.result()
+            if file_size is None:
                 print(f"ERROR: Failed to save {filename}")
             elif self.verbose:
-                file_size = filepath.stat().st_size
+                # Saves run on worker threads, so they are only reported here
+                print(f"Saved {filename}")
                 print(f"Verified {filename} saved ({file_size} bytes)")
         
         if self.verbose:
@@ -768,38 +962,68 @@ class DionaeaLogProcessor:
         
         return summary
 
-    def save_json_file(self, filename, data):
-        """Save data to JSON file with UTF-8 encoding and atomic write"""
+    def get_time_buckets(self, timestamp):
+        """Get (hour_key, day_key) stat buckets for an ISO timestamp, () if invalid"""
+        # ISO timestamps are positional, so slice the keys directly
+        if len(timestamp) >= 13 and timestamp[4] == '-' and timestamp[7] == '-' and timestamp[10] in 'T ':
+            day_key = timestamp[:10]
+            return (f"{day_key} {timestamp[11:13]}:00", day_key)
+        
+        # Fall back to full parsing for anything unusual
+        try:
+            dt = datetime.datetime.fromisoformat(timestamp.replace('Z', ''))
+            return (dt.strftime('%Y-%m-%d %H:00'), dt.strftime('%Y-%m-%d'))
+        except Exception as e:
+            if self.verbose:
+                print(f"Error parsing timestamp {timestamp}: {e}")
+            return ()
+
+    def save_json_file(self, filename, data, pretty=False, atomic=True):
+        """Save data to JSON file with UTF-8 encoding and atomic write
+        
+        Output is compact unless pretty is set. Files that are cheap to
+        regenerate can skip the temp file with atomic=False.
+        Returns the written size in bytes, or None if saving failed; success
+        is not logged here since saves may run on worker threads.
+        """
         filepath = self.output_dir / filename
-        temp_filepath = self.output_dir / f"{filename}.tmp"
+        temp_filepath = self.output_dir / f"{filename}.tmp" if atomic else filepath
         
         try:
-            # Write to temporary file first
-            with open(temp_filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, default=str, ensure_ascii=False)
+            # Write to temporary file first, encoding the whole payload up front
+            # so it reaches the file in one write instead of one per token
+            with open(temp_filepath, 'wb') as f:
+                f.write(dumps_json(data, pretty=pretty))
+                # Verify through the open descriptor instead of a second path lookup
+                f.flush()
+                file_size = os.fstat(f.fileno()).st_size
             
-            # Verify temp file was written correctly
-            if temp_filepath.exists() and temp_filepath.stat().st_size > 0:
-                # Atomically move temp file to final location
-                import shutil
-                shutil.move(temp_filepath, filepath)
-                if self.verbose:
-                    print(f"Saved {filename}")
-            else:
-                raise Exception("Temporary file was not created or is empty")
+            # Atomically move temp file to final location
+            if atomic:
+                os.replace(temp_filepath, filepath)
+            return file_size
                 
         except Exception as e:
             print(f"Error saving {filename}: {e}")
             # Clean up temp file if it exists
-            if temp_filepath.exists():
+            if atomic and temp_filepath.exists():
                 try:
                     temp_filepath.unlink()
                 except:
                     pass
+            return None
+
+    def build_upload_archive(self):
+        """Pack the dashboard data files into a single gzipped tar in memory"""
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+            for filename in _DASHBOARD_FILES:
+                filepath = self.output_dir / filename
+                if filepath.exists():
+                    archive.add(filepath, arcname=filename)
+        return buffer.getvalue()
 
 def main():
-    import argparse
-    
     parser = argparse.ArgumentParser(description='Process Dionaea logs')
     parser.add_argument('--log-path', default='/opt/dionaea/var/log/dionaea/dionaea.log', help='Path to dionaea.log')
     parser.add_argument('--output-dir', default='/root/honeypot_data', help='Output directory for JSON files')
@@ -808,6 +1032,7 @@ def main():
     parser.add_argument('--upload-user', help='Remote username for upload')
     parser.add_argument('--upload-host', help='Remote hostname for upload')
     parser.add_argument('--upload-path', help='Remote path for upload')
+    parser.add_argument('--upload-archive', action='store_true', help='Upload dashboard files as one tar stream over ssh instead of rsync')
     parser.add_argument('--no-incremental', action='store_true', help='Disable incremental processing')
     
     args = parser.parse_args()
@@ -824,20 +1049,36 @@ def main():
     
     # Handle upload if requested
     if args.upload_user and args.upload_host and args.upload_path:
-        upload_command = [
-            'rsync', '-avz', '--progress',
-            f'{args.output_dir}/',
-            f'{args.upload_user}@{args.upload_host}:{args.upload_path}'
-        ]
+        upload_input = None
+        if args.upload_archive:
+            # Stream all dashboard files through one ssh session and unpack remotely.
+            # A leading ~ is left unquoted so the remote shell still expands it,
+            # matching how rsync treats the same path
+            if args.upload_path == '~' or args.upload_path.startswith('~/'):
+                home_relative = args.upload_path[2:]
+                remote_path = '~/' + shlex.quote(home_relative) if home_relative else '~'
+            else:
+                remote_path = shlex.quote(args.upload_path)
+            upload_command = [
+                'ssh', f'{args.upload_user}@{args.upload_host}',
+                f'mkdir -p {remote_path} && tar -xzf - -C {remote_path}'
+            ]
+            upload_input = processor.build_upload_archive()
+        else:
+            # No --progress: the output is captured and discarded anyway
+            upload_command = [
+                'rsync', '-avz',
+                f'{args.output_dir}/',
+                f'{args.upload_user}@{args.upload_host}:{args.upload_path}'
+            ]
         
         try:
-            import subprocess
-            result = subprocess.run(upload_command, capture_output=True, text=True)
+            result = subprocess.run(upload_command, input=upload_input, capture_output=True)
             if result.returncode == 0:
                 if args.verbose:
                     print(f"Upload successful to {args.upload_host}:{args.upload_path}")
             else:
-                print(f"Upload failed: {result.stderr}")
+                print(f"Upload failed: {result.stderr.decode('utf-8', 'replace')}")
                 sys.exit(1)
         except Exception as e:
             print(f"Upload error: {e}")